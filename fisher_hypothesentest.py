@@ -1,9 +1,23 @@
 # fisher_hypothesentest_minimal.py
-from scipy.stats import fisher_exact
-from spielerstats import df
+import numpy as np
+
+from spielerstats import load_df
 
 ALPHA = 0.05
 
+# Gruppierungen für fisher_screen: () = ganzes Team
+SCREEN_GROUPINGS = [
+    (),
+    ("player_name",),
+    ("shot_type",),
+    ("passes",),
+    ("player_name", "shot_type"),
+    ("player_name", "shot_type", "passes"),
+]
+
+# log(k!) für k = 0..n, wächst bei Bedarf
+_log_fact = np.zeros(1)
+
 def _normalize_shot_type(s: str) -> str:
     s = s.strip().lower()
     mapping = {
@@ -19,7 +33,84 @@ def _normalize_shot_type(s: str) -> str:
     }
     return mapping.get(s, s)
 
+def _log_factorials(n_max: int):
+    """log(k!) für k = 0..n_max (einmal berechnet und wiederverwendet)."""
+    global _log_fact
+    if len(_log_fact) <= n_max:
+        _log_fact = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, n_max + 1)))])
+    return _log_fact
+
+
+def _hypergeom_logpmf(x, n, r1, c1):
+    """
+    log P(X = x) der hypergeometrischen Verteilung einer 2x2-Tafel
+    mit Gesamtzahl n, Zeilensumme r1 und Spaltensumme c1 (vektorisiert).
+    """
+    lf = _log_factorials(int(np.max(n)) if np.size(n) else 0)
+    return (
+        lf[c1] - lf[x] - lf[c1 - x]
+        + lf[n - c1] - lf[r1 - x] - lf[n - c1 - r1 + x]
+        - lf[n] + lf[r1] + lf[n - r1]
+    )
+
+
+def _logsumexp(log_p, axis=-1):
+    shift = np.max(log_p, axis=axis, keepdims=True)
+    shift = np.where(np.isfinite(shift), shift, 0.0)
+    return np.squeeze(shift, axis=axis) + np.log(np.sum(np.exp(log_p - shift), axis=axis))
+
+
+def fisher_exact_batch(tables, alternative: str = "less"):
+    """
+    Einseitige exakte Fisher-Tests für viele 2x2-Tafeln gleichzeitig.
+    tables: Array der Form (..., 2, 2) mit [[a, b], [c, d]] wie bei
+    scipy.stats.fisher_exact; alternative "less" -> P(X <= a),
+    "greater" -> P(X >= a), X = linke obere Zelle bei festen Randsummen.
+    Alle Tafeln teilen sich eine Tabelle von log-Fakultäten, die
+    hypergeometrischen Wahrscheinlichkeiten werden auf einem Gitter
+    ausgewertet und per logsumexp aufsummiert.
+    Returns:
+      p-Werte mit der Form tables.shape[:-2]
+    """
+    if alternative not in ("less", "greater"):
+        raise ValueError(f"alternative must be 'less' or 'greater' (got '{alternative}')")
+
+    t = np.asarray(tables, dtype=np.int64)
+    a, b, c, d = t[..., 0, 0], t[..., 0, 1], t[..., 1, 0], t[..., 1, 1]
+    r1, c1 = a + b, a + c
+    n = a + b + c + d
+
+    lo = np.maximum(0, r1 + c1 - n)
+    hi = np.minimum(r1, c1)
+
+    # Gitter über den Träger jeder Tafel
+    width = int(np.max(hi - lo)) + 1 if t.size else 1
+    x = lo[..., None] + np.arange(width)
+    in_support = x <= hi[..., None]
+    if alternative == "less":
+        in_tail = in_support & (x <= a[..., None])
+    else:
+        in_tail = in_support & (x >= a[..., None])
+
+    x_safe = np.where(in_support, x, lo[..., None])
+    log_p = _hypergeom_logpmf(x_safe, n[..., None], r1[..., None], c1[..., None])
+    log_p = np.where(in_tail, log_p, -np.inf)
+
+    return np.minimum(np.exp(_logsumexp(log_p)), 1.0)
+
+
+def _evidence_level(p_value: float) -> str:
+    if p_value < 0.01:
+        return "hochsignifikante Evidenz für Block-Effekt"
+    elif p_value < 0.05:
+        return "signifikante Evidenz für Block-Effekt"
+    elif p_value < 0.10:
+        return "Trend zu Block-Effekt"
+    return "kein Hinweis auf Block-Effekt"
+
+
 def fisher_hypothesentest(player: str, shot_type: str) -> str:
+    df = load_df()
     st = _normalize_shot_type(shot_type)
     p_name = player.strip().lower()
 
@@ -41,15 +132,164 @@ def fisher_hypothesentest(player: str, shot_type: str) -> str:
     if b.shape[0] == 0:
         return f"In {shot_type} der {player} hat p_Wert = —: kein Hinweis auf Block-Effekt"
 
-    _, p_value = fisher_exact([[a, b0],[c, d]], alternative="less")
+    p_value = float(fisher_exact_batch([[a, b0], [c, d]], alternative="less"))
+    level = _evidence_level(p_value)
 
-    if p_value < 0.01:
-        level = "hochsignifikante Evidenz für Block-Effekt"
-    elif p_value < 0.05:
-        level = "signifikante Evidenz für Block-Effekt"
-    elif p_value < 0.10:
-        level = "Trend zu Block-Effekt"
+    return f"In {shot_type} der {player} hat p_Wert = {p_value:.4g}: {level}"
+
+
+def _block_hit_cells(df):
+    """
+    Vier Indikator-Spalten pro Wurf für die 2x2-Tafel
+    [[Treffer ohne Block, Niete ohne Block], [Treffer mit Block, Niete mit Block]].
+    """
+    hit = df["hit"].astype(int)
+    block = df["block"].astype(int)
+    return df.assign(
+        a=((block == 0) & (hit == 1)).astype(int),
+        b=((block == 0) & (hit == 0)).astype(int),
+        c=((block == 1) & (hit == 1)).astype(int),
+        d=((block == 1) & (hit == 0)).astype(int),
+    )
+
+
+def fisher_screen(groupings=SCREEN_GROUPINGS, alpha: float = ALPHA, alternative: str = "less"):
+    """
+    Screening auf Block-Effekt für alle Gruppen auf einmal: ganzes Team,
+    pro Spieler, pro Wurfart, pro Passanzahl und deren Kombinationen
+    (siehe SCREEN_GROUPINGS). Alle Tafeln werden in einem einzigen
+    Aufruf von fisher_exact_batch ausgewertet.
+    Gruppen ohne Blockwürfe bekommen p_value = NaN (wie "—" in fisher_hypothesentest).
+    Returns:
+      DataFrame mit level, player_name, shot_type, passes, a, b, c, d,
+      p_value, significant, evidence
+    """
+    import pandas as pd
+
+    df = load_df().dropna(subset=["hit", "block"])
+    cells = _block_hit_cells(df)
+
+    frames = []
+    for keys in groupings:
+        keys = list(keys)
+        if keys:
+            counts = cells.groupby(keys, as_index=False)[["a", "b", "c", "d"]].sum()
+        else:
+            counts = cells[["a", "b", "c", "d"]].sum().to_frame().T
+        counts.insert(0, "level", " x ".join(keys) if keys else "team")
+        frames.append(counts)
+
+    result = pd.concat(frames, ignore_index=True)
+    for col in ("player_name", "shot_type", "passes"):
+        if col not in result.columns:
+            result[col] = None
+    # concat mit leeren Gruppen macht passes zu float (0.0, NaN) -> ganzzahlig mit <NA>
+    result["passes"] = result["passes"].astype("Int64")
+
+    tables = result[["a", "b", "c", "d"]].to_numpy(dtype=np.int64).reshape(-1, 2, 2)
+    p_values = fisher_exact_batch(tables, alternative=alternative)
+    p_values = np.where(result["c"] + result["d"] > 0, p_values, np.nan)
+
+    result["p_value"] = p_values
+    result["significant"] = p_values < alpha
+    result["evidence"] = [
+        _evidence_level(p) if not np.isnan(p) else "kein Hinweis auf Block-Effekt"
+        for p in p_values
+    ]
+
+    return result[[
+        "level", "player_name", "shot_type", "passes",
+        "a", "b", "c", "d", "p_value", "significant", "evidence",
+    ]]
+
+
+def permutation_test_stratified(strata="passes", n_perm=None, alternative: str = "less", seed=None):
+    """
+    Permutationstest Treffer x Block, stratifiziert (z.B. nach Passanzahl).
+    Die Block-Labels werden nur innerhalb jeder Schicht permutiert.
+    Statistik T = Summe der Treffer ohne Block (Zelle a) über alle Schichten,
+    damit ist alternative="less" gleich gerichtet wie fisher_hypothesentest.
+
+    Bei festen Randsummen ist a pro Schicht hypergeometrisch verteilt.
+      n_perm=None -> exakte Verteilung (Faltung der Schicht-Verteilungen)
+      n_perm=k    -> k Permutationen auf einmal als hypergeometrische Ziehungen
+    strata: Spaltenname oder Liste von Spaltennamen.
+    Returns:
+      dict mit statistic, expected, p_value, n_strata, method
+    """
+    if alternative not in ("less", "greater"):
+        raise ValueError(f"alternative must be 'less' or 'greater' (got '{alternative}')")
+
+    keys = [strata] if isinstance(strata, str) else list(strata)
+    df = load_df().dropna(subset=["hit", "block"])
+    counts = _block_hit_cells(df).groupby(keys)[["a", "b", "c", "d"]].sum()
+
+    a = counts["a"].to_numpy(dtype=np.int64)
+    r1 = a + counts["b"].to_numpy(dtype=np.int64)  # Würfe ohne Block
+    c1 = a + counts["c"].to_numpy(dtype=np.int64)  # Treffer
+    n = r1 + counts["c"].to_numpy(dtype=np.int64) + counts["d"].to_numpy(dtype=np.int64)
+
+    statistic = int(a.sum())
+    expected = float(np.sum(r1 * c1 / np.maximum(n, 1)))
+    lo = np.maximum(0, r1 + c1 - n)
+    hi = np.minimum(r1, c1)
+
+    if n_perm is None:
+        # Exakte Verteilung von T als Faltung der Schicht-Verteilungen
+        dist = np.ones(1)
+        for s in range(len(a)):
+            x = np.arange(lo[s], hi[s] + 1)
+            pmf = np.exp(_hypergeom_logpmf(x, n[s], r1[s], c1[s]))
+            dist = np.convolve(dist, pmf)
+        offset = int(lo.sum())
+        k = statistic - offset
+        if alternative == "less":
+            p_value = float(dist[:k + 1].sum())
+        else:
+            p_value = float(dist[k:].sum())
+        method = "exact"
     else:
-        level = "kein Hinweis auf Block-Effekt"
+        rng = np.random.default_rng(seed)
+        perm = rng.hypergeometric(c1, n - c1, r1, size=(int(n_perm), len(a))).sum(axis=1)
+        if alternative == "less":
+            extreme = np.count_nonzero(perm <= statistic)
+        else:
+            extreme = np.count_nonzero(perm >= statistic)
+        p_value = float((extreme + 1) / (int(n_perm) + 1))
+        method = f"monte carlo ({int(n_perm)} permutations)"
 
-    return f"In {shot_type} der {player} hat p_Wert = {p_value:.4g}: {level}"
+    return {
+        "strata": keys,
+        "statistic": statistic,
+        "expected": expected,
+        "p_value": min(p_value, 1.0),
+        "n_strata": len(a),
+        "method": method,
+    }
+
+
+# Kurzer Test: fisher_exact_batch gegen Referenzwerte von scipy.stats.fisher_exact
+if __name__ == "__main__":
+    tables = [
+        [[8, 2], [1, 5]],
+        [[3, 1], [1, 3]],
+        [[0, 5], [5, 0]],
+        [[10, 10], [10, 10]],
+        [[50, 40], [30, 60]],
+        [[0, 0], [3, 4]],
+        [[12, 30], [25, 18]],
+    ]
+    expected = {
+        "less": [
+            0.9991258741258742, 0.9857142857142858, 0.003968253968253969, 0.6238144327180455,
+            0.9992216886533446, 1.0, 0.005457587428898143,
+        ],
+        "greater": [
+            0.024475524475524483, 0.24285714285714283, 1.0, 0.6238144327180455,
+            0.0021182245526932173, 1.0, 0.9986226356818232,
+        ],
+    }
+    for alternative, p_ref in expected.items():
+        p = fisher_exact_batch(tables, alternative)
+        assert np.allclose(p, p_ref, rtol=1e-10, atol=0), (alternative, p, p_ref)
+        print(f"{alternative}: {', '.join(f'{x:.4g}' for x in p)}")
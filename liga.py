@@ -0,0 +1,215 @@
+import numpy as np
+
+from simulation import expand_player_spec, team_prob_arrays
+
+
+# 1) Teams einer Liga bestimmen
+
+def build_league_from_players(player_specs, team_names=None):
+    """
+    Baut beliebig viele Teams aus player_specs (gleiches Format wie in
+    simulation.build_teams_from_players):
+      (player_name, team_name, total_attempts, n_wurf, n_3er, n_layup, passes)
+    team_names legt die Reihenfolge der Teams fest; ohne Angabe wird die
+    Reihenfolge des ersten Auftretens in player_specs benutzt.
+    Returns:
+      dict {team_name: team} mit team = {"name": ..., "players": [...]}
+    """
+    teams = {}
+    attempts = {}
+
+    if team_names is not None:
+        for name in team_names:
+            teams[name] = {"name": name, "players": []}
+            attempts[name] = 0
+
+    for spec in player_specs:
+        t_name, total_attempts, entries = expand_player_spec(spec)
+
+        if t_name not in teams:
+            if team_names is not None:
+                raise ValueError(
+                    f"Invalid team name '{t_name}' for player {spec[0]}. "
+                    f"Allowed: {', '.join(repr(n) for n in team_names)}"
+                )
+            teams[t_name] = {"name": t_name, "players": []}
+            attempts[t_name] = 0
+
+        teams[t_name]["players"].extend(entries)
+        attempts[t_name] += total_attempts
+
+    # Versuch Anzahl Debugging
+    for name, n in attempts.items():
+        if n > 100:
+            raise ValueError(f"Team '{name}' > 100 attempts ({n})")
+
+    return teams
+
+
+
+# 2) Spielplan
+
+def round_robin_schedule(team_names, rounds: int = 1):
+    """
+    Jeder gegen jeden: Liste von Paarungen (heim, gast).
+    Bei rounds=2 (Hin- und Rückrunde) werden Heim und Gast getauscht.
+    """
+    names = list(team_names)
+    schedule = []
+
+    for r in range(rounds):
+        for i in range(len(names)):
+            for j in range(i + 1, len(names)):
+                if r % 2 == 0:
+                    schedule.append((names[i], names[j]))
+                else:
+                    schedule.append((names[j], names[i]))
+
+    return schedule
+
+
+
+# 3) Saisons simulieren (vektorisiert)
+
+def _simulate_team_scores(arrays: dict, shape, rng):
+    """
+    Zieht die Punkte eines Teams für viele Spiele auf einmal.
+    Pro Spieler+Wurfart genügen drei Binomial-Ziehungen statt eines
+    Zufallswerts pro Versuch:
+      Blocks ~ Bin(n, p_block), Treffer ~ Bin(Blocks, p_b) + Bin(n - Blocks, p_nb)
+    Returns:
+      Array der Form shape mit den Punkten pro Spiel
+    """
+    size = tuple(shape) + (len(arrays["attempts"]),)
+
+    n_blocked = rng.binomial(arrays["attempts"], arrays["p_block"], size=size)
+    hits = (
+        rng.binomial(n_blocked, arrays["p_b"])
+        + rng.binomial(arrays["attempts"] - n_blocked, arrays["p_nb"])
+    )
+
+    return hits @ arrays["points_per_hit"]
+
+
+def simulate_league_seasons(
+    player_specs,
+    n_seasons: int = 10000,
+    schedule=None,
+    team_names=None,
+    rounds: int = 1,
+    threshold_block: float = 0.5,
+    points_win: int = 2,
+    points_draw: int = 1,
+    seed=None,
+):
+    """
+    Simuliert n_seasons komplette Saisons einer Liga.
+    schedule ist eine Liste von Paarungen (heim, gast); ohne Angabe wird
+    round_robin_schedule(team_names, rounds) benutzt.
+
+    Die Wahrscheinlichkeiten pro Team werden nur einmal berechnet. Danach
+    werden alle Spiele aller Saisons eines Teams in einem Schritt gezogen.
+
+    Tabelle pro Saison: Ligapunkte (Sieg = points_win, Unentschieden =
+    points_draw), bei Gleichstand entscheidet die Punktedifferenz, dann die
+    erzielten Punkte, danach das Los.
+
+    Returns:
+      dict mit
+        "teams", "schedule", "n_seasons",
+        "table": Liste von Dicts pro Team (sortiert nach mittleren Ligapunkten),
+        "rank_probs": {team: Wahrscheinlichkeit für Platz 1..n},
+        "league_points": Array (n_seasons, n_teams) = Verteilung der Ligapunkte
+    """
+    if n_seasons < 1:
+        raise ValueError(f"n_seasons must be at least 1 (got {n_seasons})")
+
+    teams = build_league_from_players(player_specs, team_names)
+    names = list(teams)
+    index = {name: i for i, name in enumerate(names)}
+
+    if schedule is None:
+        schedule = round_robin_schedule(names, rounds)
+
+    for home, away in schedule:
+        for name in (home, away):
+            if name not in index:
+                raise ValueError(f"Unknown team '{name}' in schedule")
+        if home == away:
+            raise ValueError(f"Team '{home}' cannot play against itself")
+
+    n_teams = len(names)
+    home_idx = np.array([index[h] for h, _ in schedule], dtype=np.int64)
+    away_idx = np.array([index[a] for _, a in schedule], dtype=np.int64)
+
+    rng = np.random.default_rng(seed)
+
+    # Punkte pro Spiel: (n_seasons, Anzahl Spiele) für Heim- und Gastteam
+    home_scores = np.zeros((n_seasons, len(schedule)), dtype=np.int64)
+    away_scores = np.zeros((n_seasons, len(schedule)), dtype=np.int64)
+
+    for name, team in teams.items():
+        i = index[name]
+        is_home = home_idx == i
+        is_away = away_idx == i
+        n_games = int(is_home.sum() + is_away.sum())
+        if n_games == 0:
+            continue
+
+        arrays = team_prob_arrays(team, threshold_block)
+        scores = _simulate_team_scores(arrays, (n_seasons, n_games), rng)
+
+        n_home = int(is_home.sum())
+        home_scores[:, is_home] = scores[:, :n_home]
+        away_scores[:, is_away] = scores[:, n_home:]
+
+    # Ligapunkte und Punktedifferenz pro Team
+    home_result = np.sign(home_scores - away_scores)
+    home_points = np.where(home_result > 0, points_win, np.where(home_result == 0, points_draw, 0))
+    away_points = np.where(home_result < 0, points_win, np.where(home_result == 0, points_draw, 0))
+
+    league_points = np.zeros((n_seasons, n_teams), dtype=np.int64)
+    points_for = np.zeros((n_seasons, n_teams), dtype=np.int64)
+    points_against = np.zeros((n_seasons, n_teams), dtype=np.int64)
+
+    # Spalten (Spiele) pro Team aufsummieren
+    home_onehot = np.eye(n_teams, dtype=np.int64)[home_idx]
+    away_onehot = np.eye(n_teams, dtype=np.int64)[away_idx]
+
+    league_points += home_points @ home_onehot + away_points @ away_onehot
+    points_for += home_scores @ home_onehot + away_scores @ away_onehot
+    points_against += away_scores @ home_onehot + home_scores @ away_onehot
+
+    # Platzierung pro Saison (kompletter Gleichstand -> Losentscheid)
+    diff = points_for - points_against
+    lots = rng.random((n_seasons, n_teams))
+    order = np.lexsort((lots, -points_for, -diff, -league_points), axis=-1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(n_teams)[None, :], axis=-1)
+
+    rank_counts = np.stack([
+        np.bincount(ranks[:, i], minlength=n_teams) for i in range(n_teams)
+    ])
+    rank_probs = rank_counts / n_seasons
+
+    table = []
+    for name, i in index.items():
+        table.append({
+            "team": name,
+            "mean_league_points": float(league_points[:, i].mean()),
+            "std_league_points": float(league_points[:, i].std()),
+            "mean_points_for": float(points_for[:, i].mean()),
+            "mean_points_against": float(points_against[:, i].mean()),
+            "mean_rank": float(ranks[:, i].mean() + 1),
+            "title_prob": float(rank_probs[i, 0]),
+        })
+    table.sort(key=lambda row: row["mean_league_points"], reverse=True)
+
+    return {
+        "teams": names,
+        "schedule": schedule,
+        "n_seasons": n_seasons,
+        "table": table,
+        "rank_probs": {name: rank_probs[i] for name, i in index.items()},
+        "league_points": league_points,
+    }
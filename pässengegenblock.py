@@ -1,30 +1,89 @@
-import pandas as pd
+import hashlib
+import io
+import os
 
-# 1. CSV korrekt einlesen (Trennzeichen ; )
-df = pd.read_csv("Basketball_Daten.csv", sep=";")
+CSV_PATH = "Basketball_Daten.csv"
 
-# 2. Spaltennamen von Leerzeichen bereinigen
-df.columns = df.columns.str.strip()
-# Jetzt heißen die Spalten: id, player_name, shot_type, block, passes, points, hit
+# Werden erst beim ersten Aufruf von _load_pass_stats() berechnet
+_cache = None
 
-# 3. Block-Flag aus "Ja"/"Nein" erzeugen
-df["block_flag"] = df["block"].map({"Ja": 1, "Nein": 0})
 
-# 4. Blockwahrscheinlichkeit pro Passanzahl berechnen
-pass_stats = (
-    df.groupby("passes")["block_flag"]
-      .mean()
-      .reset_index()
-      .rename(columns={"block_flag": "block_prob"})
-)
+def _load_pass_stats():
+    """
+    Liest die Daten beim ersten Aufruf ein und berechnet die
+    Blockwahrscheinlichkeiten pro Passanzahl; danach aus dem Speicher.
+    Hat sich die CSV-Datei seitdem geändert, wird neu gerechnet
+    (manuell: reload_data()).
+    """
+    global _cache
+    stat = os.stat(CSV_PATH)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if _cache is not None and _cache["stamp"] == stamp:
+        return _cache
 
-# 5. Lookup-Table und Gesamtwahrscheinlichkeit
-prob_by_passes = dict(zip(pass_stats["passes"], pass_stats["block_prob"]))
-overall_prob = df["block_flag"].mean()
+    import pandas as pd
+
+    # 1. CSV korrekt einlesen (Trennzeichen ; )
+    with open(CSV_PATH, "rb") as f:
+        raw = f.read()
+    df = pd.read_csv(io.BytesIO(raw), sep=";")
+
+    # 2. Spaltennamen von Leerzeichen bereinigen
+    df.columns = df.columns.str.strip()
+    # Jetzt heißen die Spalten: id, player_name, shot_type, block, passes, points, hit
+
+    # 3. Block-Flag aus "Ja"/"Nein" erzeugen
+    df["block_flag"] = df["block"].map({"Ja": 1, "Nein": 0})
+
+    # 4. Blockwahrscheinlichkeit pro Passanzahl berechnen
+    pass_stats = (
+        df.groupby("passes")["block_flag"]
+          .mean()
+          .reset_index()
+          .rename(columns={"block_flag": "block_prob"})
+    )
+
+    # 5. Lookup-Table und Gesamtwahrscheinlichkeit
+    _cache = {
+        "df": df,
+        "pass_stats": pass_stats,
+        "prob_by_passes": dict(zip(pass_stats["passes"], pass_stats["block_prob"])),
+        "overall_prob": df["block_flag"].mean(),
+        "stamp": stamp,
+        "fingerprint": hashlib.sha256(raw).hexdigest(),
+    }
+    return _cache
+
+
+def reload_data():
+    """Verwirft die berechneten Blockwahrscheinlichkeiten; der nächste Zugriff liest die CSV neu."""
+    global _cache
+    _cache = None
+
+
+def data_fingerprint() -> str:
+    """
+    SHA-256 der CSV-Bytes, ohne die Daten zu parsen (kein pandas-Import).
+    Sind die Blockwahrscheinlichkeiten berechnet und die Datei unverändert,
+    ist das der Fingerprint der geladenen Daten.
+    """
+    stat = os.stat(CSV_PATH)
+    if _cache is not None and _cache["stamp"] == (stat.st_mtime_ns, stat.st_size):
+        return _cache["fingerprint"]
+    with open(CSV_PATH, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def __getattr__(name):
+    # df, pass_stats, prob_by_passes, overall_prob bleiben als Modul-Attribute verfügbar
+    if name in ("df", "pass_stats", "prob_by_passes", "overall_prob"):
+        return _load_pass_stats()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def predict_block_by_passes(passes, threshold=0.5):
-    prob = prob_by_passes.get(passes, overall_prob)
+    stats = _load_pass_stats()
+    prob = stats["prob_by_passes"].get(passes, stats["overall_prob"])
 
     # Cast to normal Python types
     prob = float(prob)
@@ -35,7 +94,7 @@ def predict_block_by_passes(passes, threshold=0.5):
 
 # 6. Kurzer Test
 if __name__ == "__main__":
-    for k in sorted(df["passes"].unique()):
+    for k in sorted(_load_pass_stats()["df"]["passes"].unique()):
         blocked, p = predict_block_by_passes(k)
         print(f"Pässe={k}: p_block={p:.3f}, Vorhersage={'BLOCK' if blocked else 'KEIN BLOCK'}")
 
@@ -1,32 +1,33 @@
-import importlib
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 
 import spielerstats
-import pässengegenblock
 from pässengegenblock import predict_block_by_passes
 from binomialverteilung_ultis import binomial_expectation
 
-# Reload modules
-importlib.reload(spielerstats)
-importlib.reload(pässengegenblock)
+# Daten (spielerstats, pässengegenblock) werden erst beim ersten Zugriff geladen,
+# pandas und matplotlib erst in den Plot-Funktionen importiert.
 
 
 # 1) Treffer Wahrscheinlichkeit
 
-def get_player_hit_probs(player_name: str, shot_type: str):
+def get_player_hit_probs(player_name: str, shot_type: str, smoothed: bool = True):
     """
     Returns (p_nb, p_b):
       p_nb = hit probability without block
       p_b  = hit probability with block
-    Based on the cleaned spielerstats.df.
+    smoothed=True: Lookup in spielerstats.hit_prob_table() (Shrinkage zum
+    Mittel der Wurfart, keine 0.0 für Zellen ohne Würfe).
+    smoothed=False: rohe Trefferquoten aus spielerstats.load_df().
+    Unbekannte Spieler oder Wurfarten -> (0.0, 0.0).
     """
-    df = spielerstats.df
-
     p = player_name.strip().lower()
     st = shot_type.strip().lower()
 
+    if smoothed:
+        return spielerstats.hit_prob_table().get((p, st), (0.0, 0.0))
+
+    df = spielerstats.load_df()
+
     player_df = df[df["player_name"].str.lower() == p]
     if player_df.empty:
         return 0.0, 0.0
@@ -47,6 +48,47 @@ def get_player_hit_probs(player_name: str, shot_type: str):
 
 # 2) Teams bestimmen
 
+def expand_player_spec(spec):
+    """
+    Prüft eine Zeile aus player_specs und teilt sie in Einträge pro Wurfart auf.
+    Returns:
+      team_name, total_attempts, entries (Liste von Dicts wie in team["players"])
+    """
+    (
+        player_name,
+        t_name,
+        total_attempts,
+        n_wurf,
+        n_3er,
+        n_layup,
+        passes,
+    ) = spec
+
+    # Konsistenz Debugging
+    if total_attempts != (n_wurf + n_3er + n_layup):
+        raise ValueError(
+            f"Attempt mismatch for player {player_name}: "
+            f"total={total_attempts}, breakdown={n_wurf + n_3er + n_layup}"
+        )
+
+    # Anzahl jeder Wurfart hinzufügen
+    entries = []
+    if n_wurf > 0:
+        entries.append(
+            {"name": player_name, "shot_type": "wurf", "passes": passes, "attempts": int(n_wurf)}
+        )
+    if n_3er > 0:
+        entries.append(
+            {"name": player_name, "shot_type": "3er-wurf", "passes": passes, "attempts": int(n_3er)}
+        )
+    if n_layup > 0:
+        entries.append(
+            {"name": player_name, "shot_type": "layup", "passes": passes, "attempts": int(n_layup)}
+        )
+
+    return t_name, total_attempts, entries
+
+
 def build_teams_from_players(team1_name: str, team2_name: str, player_specs):
     """
     Zwei Teams werden durch eine Liste bestimmt: player_specs.
@@ -60,22 +102,7 @@ def build_teams_from_players(team1_name: str, team2_name: str, player_specs):
     attempts_team2 = 0
 
     for spec in player_specs:
-        (
-            player_name,
-            t_name,
-            total_attempts,
-            n_wurf,
-            n_3er,
-            n_layup,
-            passes,
-        ) = spec
-
-        # Konsistenz Debugging
-        if total_attempts != (n_wurf + n_3er + n_layup):
-            raise ValueError(
-                f"Attempt mismatch for player {player_name}: "
-                f"total={total_attempts}, breakdown={n_wurf + n_3er + n_layup}"
-            )
+        t_name, total_attempts, entries = expand_player_spec(spec)
 
         # Team der Spieler bestimmen
         if t_name == team1_name:
@@ -86,23 +113,11 @@ def build_teams_from_players(team1_name: str, team2_name: str, player_specs):
             attempts_team2 += total_attempts
         else:
             raise ValueError(
-                f"Invalid team name '{t_name}' for player {player_name}. "
+                f"Invalid team name '{t_name}' for player {spec[0]}. "
                 f"Allowed: '{team1_name}' or '{team2_name}'"
             )
 
-        # Anzahl jeder Wurfart hinzufügen
-        if n_wurf > 0:
-            team["players"].append(
-                {"name": player_name, "shot_type": "wurf", "passes": passes, "attempts": int(n_wurf)}
-            )
-        if n_3er > 0:
-            team["players"].append(
-                {"name": player_name, "shot_type": "3er-wurf", "passes": passes, "attempts": int(n_3er)}
-            )
-        if n_layup > 0:
-            team["players"].append(
-                {"name": player_name, "shot_type": "layup", "passes": passes, "attempts": int(n_layup)}
-            )
+        team["players"].extend(entries)
 
     # Versuch Anzahl Debugging
     if attempts_team1 > 100:
@@ -383,6 +398,753 @@ def expected_details_from_player_specs(
 
 
 
+# 6c) Wahrscheinlichkeiten pro Team als Arrays (für vektorisierte Simulationen)
+
+# Datentypen der Batch-Simulationen:
+#   uniform = Zufallszahlen und Wahrscheinlichkeiten pro Versuch
+#   count   = Treffer, Blocks und Punkte
+# Block-/Treffer-Masken sind immer bool (1 Byte pro Versuch).
+# "compact" halbiert die Zufallszahlen und viertelt die Zählarrays;
+# Punkte pro Team (max. 100 Versuche * 3) passen sicher in int16.
+DTYPE_POLICIES = {
+    "default": {"uniform": np.float64, "count": np.int64},
+    "compact": {"uniform": np.float32, "count": np.int16},
+}
+
+
+def _get_dtype_policy(dtype_policy: str) -> dict:
+    """Liefert die Datentypen zu einem Namen aus DTYPE_POLICIES."""
+    if dtype_policy not in DTYPE_POLICIES:
+        raise ValueError(
+            f"Unknown dtype_policy '{dtype_policy}'. "
+            f"Allowed: {', '.join(repr(k) for k in DTYPE_POLICIES)}"
+        )
+    return DTYPE_POLICIES[dtype_policy]
+
+
+def team_prob_arrays(team: dict, threshold_block: float = 0.5):
+    """
+    Fasst die Wahrscheinlichkeiten eines Teams pro Spieler+Wurfart in Arrays zusammen:
+      attempts, p_block, p_nb, p_b, points_per_hit
+    Wird einmal pro Team berechnet und dann für beliebig viele Spiele benutzt.
+    """
+    attempts, p_block, p_nb, p_b, points_per_hit = [], [], [], [], []
+
+    for cfg in team["players"]:
+        shot_type = cfg["shot_type"]
+
+        nb, b = get_player_hit_probs(cfg["name"], shot_type)
+        _, blk = predict_block_by_passes(cfg["passes"], threshold=threshold_block)
+
+        attempts.append(int(cfg["attempts"]))
+        p_block.append(blk)
+        p_nb.append(nb)
+        p_b.append(b)
+        points_per_hit.append(3 if shot_type == "3er-wurf" else 2)
+
+    return {
+        "attempts": np.array(attempts, dtype=np.int64),
+        "p_block": np.array(p_block, dtype=float),
+        "p_nb": np.array(p_nb, dtype=float),
+        "p_b": np.array(p_b, dtype=float),
+        "points_per_hit": np.array(points_per_hit, dtype=np.int64),
+    }
+
+
+def _expand_to_attempts(arrays: dict, policy: dict = DTYPE_POLICIES["default"]):
+    """
+    Wiederholt die Werte pro Spieler+Wurfart für jeden einzelnen Versuch,
+    damit jeder Versuch eine feste Spalte (Slot) in den Zufallszahlen bekommt.
+    Die Wahrscheinlichkeiten bekommen den Datentyp der Zufallszahlen,
+    damit beim Vergleich keine float64-Kopien entstehen.
+    """
+    reps = arrays["attempts"]
+    slots = {
+        key: np.repeat(arrays[key], reps).astype(policy["uniform"])
+        for key in ("p_block", "p_nb", "p_b")
+    }
+    slots["points_per_hit"] = np.repeat(arrays["points_per_hit"], reps).astype(policy["count"])
+    return slots
+
+
+def _simulate_attempts(slots: dict, u_block, u_hit):
+    """
+    Simuliert alle Versuche eines Teams für viele Spiele gleichzeitig.
+    u_block, u_hit: gleichverteilte Zufallszahlen der Form (n_sims, n_slots),
+    n_slots >= Anzahl Versuche des Teams.
+    Returns:
+      blocked, hits (bool-Arrays der Form (n_sims, Anzahl Versuche))
+    """
+    n = len(slots["p_block"])
+
+    blocked = u_block[:, :n] < slots["p_block"]
+    hits = np.where(
+        blocked,
+        u_hit[:, :n] < slots["p_b"],
+        u_hit[:, :n] < slots["p_nb"],
+    )
+
+    return blocked, hits
+
+
+def _attempt_keys(team: dict):
+    """
+    Schlüssel (Spieler, Wurfart, k) für jeden Versuch eines Teams in der
+    Reihenfolge von _expand_to_attempts. k zählt die Versuche derselben
+    Spieler+Wurfart-Kombination durch (auch über mehrere Einträge hinweg).
+    """
+    keys = []
+    seen = {}
+    for cfg in team["players"]:
+        base = (cfg["name"].strip().lower(), cfg["shot_type"])
+        start = seen.get(base, 0)
+        keys.extend(base + (k,) for k in range(start, start + int(cfg["attempts"])))
+        seen[base] = start + int(cfg["attempts"])
+    return keys
+
+
+def _mean_and_se(values):
+    """Mittelwert und Standardfehler einer Stichprobe unabhängiger Werte."""
+    values = np.asarray(values, dtype=float)
+    return float(values.mean()), float(values.std(ddof=1) / np.sqrt(len(values)))
+
+
+
+# 6d) Aufstellungen vergleichen (Common Random Numbers + antithetische Variablen)
+
+def compare_lineups_from_player_specs(
+    team1_name: str,
+    team2_name: str,
+    lineups,
+    n_sims: int = 10000,
+    threshold_block: float = 0.5,
+    antithetic: bool = True,
+    seed=None,
+    dtype_policy: str = "default",
+):
+    """
+    Vergleicht mehrere Aufstellungen für team1 gegen denselben Gegner team2.
+    lineups ist ein Dict {name: player_specs} oder eine Liste von player_specs;
+    die erste Aufstellung ist die Referenz. Die Angaben für team2 müssen in
+    allen Aufstellungen gleich sein (Reihenfolge egal), sonst ValueError.
+
+    Alle Aufstellungen werden mit denselben Zufallszahlen simuliert
+    (Common Random Numbers): der k-te Versuch eines Spielers mit einer
+    Wurfart benutzt in jeder Aufstellung dieselbe Zufallszahl, unabhängig von
+    der Reihenfolge in player_specs. Mit antithetic=True wird jede Ziehung u
+    zusätzlich mit 1 - u gespiegelt; n_sims wird dann auf eine gerade Zahl
+    aufgerundet (siehe "n_sims" im Ergebnis). Die Differenzen zur Referenz
+    streuen dadurch viel weniger als bei unabhängigen Simulationen.
+
+    dtype_policy: siehe DTYPE_POLICIES ("compact" für sehr große n_sims).
+
+    Returns:
+      dict mit Siegquote und mittlerer Punktedifferenz pro Aufstellung sowie
+      der Differenz zur Referenz, jeweils mit Standardfehler.
+    """
+    if isinstance(lineups, dict):
+        named_lineups = list(lineups.items())
+    else:
+        named_lineups = list(enumerate(lineups))
+
+    if not named_lineups:
+        raise ValueError("At least one lineup is required")
+
+    # Standardfehler braucht mindestens 2 unabhängige Einheiten (antithetisch: Paare)
+    n_draws = (n_sims + 1) // 2 if antithetic else n_sims
+    if n_draws < 2:
+        min_sims = 3 if antithetic else 2
+        raise ValueError(f"n_sims must be at least {min_sims} (got {n_sims})")
+
+    policy = _get_dtype_policy(dtype_policy)
+
+    # Wahrscheinlichkeiten pro Versuch für jede Aufstellung einmal bestimmen
+    slots, keys = [], []
+    reference_opponent = None
+    for name, specs in named_lineups:
+        team1, team2 = build_teams_from_players(team1_name, team2_name, specs)
+
+        # Gepaarte Differenzen sind nur gegen denselben Gegner sinnvoll
+        opponent = sorted(
+            (p["name"].strip().lower(), p["shot_type"], p["passes"], p["attempts"])
+            for p in team2["players"]
+        )
+        if reference_opponent is None:
+            reference_opponent = opponent
+        elif opponent != reference_opponent:
+            raise ValueError(
+                f"Lineup {name!r} uses different '{team2_name}' specs than the reference lineup"
+            )
+
+        slots.append((
+            _expand_to_attempts(team_prob_arrays(team1, threshold_block), policy),
+            _expand_to_attempts(team_prob_arrays(team2, threshold_block), policy),
+        ))
+        keys.append((_attempt_keys(team1), _attempt_keys(team2)))
+
+    # Spalte der Zufallszahlen pro (Spieler, Wurfart, k) über alle Aufstellungen
+    columns = [{}, {}]
+    for lineup_keys in keys:
+        for side, side_keys in enumerate(lineup_keys):
+            for key in side_keys:
+                columns[side].setdefault(key, len(columns[side]))
+    cols = [
+        tuple(np.array([columns[side][key] for key in side_keys], dtype=np.int64)
+              for side, side_keys in enumerate(lineup_keys))
+        for lineup_keys in keys
+    ]
+
+    # Gemeinsame Zufallszahlen für alle Aufstellungen
+    rng = np.random.default_rng(seed)
+    width1, width2 = len(columns[0]), len(columns[1])
+    uniforms = [
+        rng.random((n_draws, width), dtype=policy["uniform"])
+        for width in (width1, width1, width2, width2)
+    ]
+    if antithetic:
+        uniforms = [np.concatenate([u, 1 - u]) for u in uniforms]
+    u_block1, u_hit1, u_block2, u_hit2 = uniforms
+
+    def _units(values):
+        # Antithetische Paare zu einer unabhängigen Einheit zusammenfassen
+        if antithetic:
+            return values.reshape(2, n_draws).mean(axis=0)
+        return values
+
+    wins, margins = [], []
+    for (s1, s2), (c1, c2) in zip(slots, cols):
+        _, hits1 = _simulate_attempts(s1, u_block1[:, c1], u_hit1[:, c1])
+        _, hits2 = _simulate_attempts(s2, u_block2[:, c2], u_hit2[:, c2])
+
+        score1 = hits1 @ s1["points_per_hit"]
+        score2 = hits2 @ s2["points_per_hit"]
+
+        wins.append(_units((score1 > score2).astype(float)))
+        margins.append(_units((score1 - score2).astype(float)))
+
+    results = []
+    for (name, _), win, margin in zip(named_lineups, wins, margins):
+        win_rate, win_rate_se = _mean_and_se(win)
+        mean_margin, mean_margin_se = _mean_and_se(margin)
+
+        entry = {
+            "lineup": name,
+            "win_rate": win_rate,
+            "win_rate_se": win_rate_se,
+            "mean_margin": mean_margin,
+            "mean_margin_se": mean_margin_se,
+        }
+
+        # Differenz zur Referenz (gepaart -> kleiner Standardfehler)
+        win_diff, win_diff_se = _mean_and_se(win - wins[0])
+        margin_diff, margin_diff_se = _mean_and_se(margin - margins[0])
+        entry.update({
+            "win_rate_diff": win_diff,
+            "win_rate_diff_se": win_diff_se,
+            "margin_diff": margin_diff,
+            "margin_diff_se": margin_diff_se,
+        })
+
+        results.append(entry)
+
+    return {
+        "team1_name": team1_name,
+        "team2_name": team2_name,
+        "baseline": named_lineups[0][0],
+        "n_sims": 2 * n_draws if antithetic else n_sims,
+        "lineups": results,
+    }
+
+
+
+# 6e) Detaildaten als Stream (Chunks mit fester Größe)
+
+def _simulate_team_details(arrays: dict, slots: dict, u_block, u_hit, count_dtype=np.int64):
+    """
+    Simuliert ein Team für viele Spiele und fasst die Versuche pro
+    Spieler+Wurfart zusammen.
+    Returns:
+      hits, blocks (int-Arrays der Form (n_sims, Anzahl Spieler+Wurfart))
+    """
+    n_sims = u_block.shape[0]
+    n_rows = len(arrays["attempts"])
+    if n_rows == 0:
+        empty = np.zeros((n_sims, 0), dtype=count_dtype)
+        return empty, empty
+
+    blocked, hits = _simulate_attempts(slots, u_block, u_hit)
+
+    # Versuche sind pro Spieler+Wurfart zusammenhängend -> Summen per reduceat
+    starts = np.cumsum(arrays["attempts"]) - arrays["attempts"]
+    hits_rows = np.add.reduceat(hits, starts, axis=1, dtype=count_dtype)
+    blocks_rows = np.add.reduceat(blocked, starts, axis=1, dtype=count_dtype)
+
+    return hits_rows, blocks_rows
+
+
+def iter_detail_chunks(
+    team1_name: str,
+    team2_name: str,
+    player_specs,
+    n_sims: int,
+    chunk_size: int = 1000,
+    threshold_block: float = 0.5,
+    seed=None,
+    dtype_policy: str = "default",
+):
+    """
+    Simuliert n_sims Spiele und liefert die Detaildaten (wie in
+    simulate_match_from_player_specs) stückweise als Generator.
+    Jeder Chunk enthält höchstens chunk_size Spiele, der Speicherbedarf
+    bleibt also unabhängig von n_sims konstant.
+
+    Ein Chunk ist ein Dict von gleich langen Arrays (eine Zeile pro Spiel,
+    Team, Spieler und Wurfart):
+      sim, team, player, shot_type, attempts, hits, points, blocks
+    Mit dtype_policy="compact" (siehe DTYPE_POLICIES) sind hits, points und
+    blocks int16 und die Zufallszahlen float32.
+
+    Beispiel (direkt auf die Festplatte schreiben):
+      for i, chunk in enumerate(iter_detail_chunks("Wind", "Blitz", specs, 10**6)):
+          pd.DataFrame(chunk).to_csv("details.csv", mode="a", header=(i == 0), index=False)
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1 (got {chunk_size})")
+
+    policy = _get_dtype_policy(dtype_policy)
+    team1, team2 = build_teams_from_players(team1_name, team2_name, player_specs)
+
+    teams = []
+    for team in (team1, team2):
+        arrays = team_prob_arrays(team, threshold_block)
+        teams.append((team, arrays, _expand_to_attempts(arrays, policy)))
+
+    # Zeilen-Beschriftung pro Spiel (für alle Chunks gleich)
+    labels_team = np.array([t["name"] for t, _, _ in teams for _ in t["players"]])
+    labels_player = np.array([cfg["name"] for t, _, _ in teams for cfg in t["players"]])
+    labels_shot = np.array([cfg["shot_type"] for t, _, _ in teams for cfg in t["players"]])
+    attempts = np.concatenate([a["attempts"] for _, a, _ in teams])
+    points_per_hit = np.concatenate([a["points_per_hit"] for _, a, _ in teams]).astype(policy["count"])
+    n_rows = len(attempts)
+
+    rng = np.random.default_rng(seed)
+
+    for start in range(0, n_sims, chunk_size):
+        m = min(chunk_size, n_sims - start)
+
+        hits, blocks = [], []
+        for _, arrays, slots in teams:
+            width = len(slots["p_block"])
+            u_block = rng.random((m, width), dtype=policy["uniform"])
+            u_hit = rng.random((m, width), dtype=policy["uniform"])
+            h, b = _simulate_team_details(arrays, slots, u_block, u_hit, policy["count"])
+            hits.append(h)
+            blocks.append(b)
+
+        hits = np.hstack(hits)
+        blocks = np.hstack(blocks)
+
+        yield {
+            "sim": np.repeat(np.arange(start, start + m), n_rows),
+            "team": np.tile(labels_team, m),
+            "player": np.tile(labels_player, m),
+            "shot_type": np.tile(labels_shot, m),
+            "attempts": np.tile(attempts, m),
+            "hits": hits.ravel(),
+            "points": (hits * points_per_hit).ravel(),
+            "blocks": blocks.ravel(),
+        }
+
+
+def summarize_detail_chunks(chunks, by=("team", "player")):
+    """
+    Reduziert einen Stream von Detail-Chunks (z.B. aus iter_detail_chunks)
+    online zu Mittelwert und Varianz der Punkte pro Gruppe.
+    Die Punkte werden pro Spiel innerhalb der Gruppe summiert
+    (by=("team", "player") -> alle Wurfarten eines Spielers zusammen).
+    Es wird nur eine Zusammenfassung pro Gruppe gespeichert, nie die Rohdaten.
+
+    Returns:
+      Liste von Dicts mit den Gruppen-Spalten sowie
+      n_sims, mean_points, var_points
+    """
+    by = tuple(by)
+    group_ids = {}
+    n_total = np.zeros(0)
+    mean_total = np.zeros(0)
+    m2_total = np.zeros(0)
+
+    for chunk in chunks:
+        # Gruppen dieses Chunks auf globale Gruppen-Nummern abbilden
+        keys = list(zip(*(np.asarray(chunk[col]).tolist() for col in by)))
+        for key in keys:
+            group_ids.setdefault(key, len(group_ids))
+        gid = np.array([group_ids[key] for key in keys], dtype=np.int64)
+
+        n_groups = len(group_ids)
+        if len(n_total) < n_groups:
+            grow = n_groups - len(n_total)
+            n_total = np.concatenate([n_total, np.zeros(grow)])
+            mean_total = np.concatenate([mean_total, np.zeros(grow)])
+            m2_total = np.concatenate([m2_total, np.zeros(grow)])
+
+        # Punkte pro (Spiel, Gruppe) summieren
+        sims, sim_idx = np.unique(np.asarray(chunk["sim"]), return_inverse=True)
+        flat = sim_idx * n_groups + gid
+        size = len(sims) * n_groups
+        points = np.bincount(flat, weights=np.asarray(chunk["points"], dtype=float), minlength=size)
+        present = np.bincount(flat, minlength=size) > 0
+        points = points.reshape(len(sims), n_groups)
+        present = present.reshape(len(sims), n_groups)
+
+        # Mittelwert/Varianz des Chunks und Zusammenführen (Chan et al.)
+        n_chunk = present.sum(axis=0).astype(float)
+        safe_n = np.maximum(n_chunk, 1.0)
+        mean_chunk = np.where(present, points, 0.0).sum(axis=0) / safe_n
+        m2_chunk = np.where(present, (points - mean_chunk) ** 2, 0.0).sum(axis=0)
+
+        n_new = n_total + n_chunk
+        safe_new = np.maximum(n_new, 1.0)
+        delta = mean_chunk - mean_total
+        mean_total = mean_total + delta * n_chunk / safe_new
+        m2_total = m2_total + m2_chunk + delta ** 2 * n_total * n_chunk / safe_new
+        n_total = n_new
+
+    summary = []
+    for key, g in group_ids.items():
+        n = int(n_total[g])
+        entry = dict(zip(by, key))
+        entry.update({
+            "n_sims": n,
+            "mean_points": float(mean_total[g]),
+            "var_points": float(m2_total[g] / (n - 1)) if n > 1 else 0.0,
+        })
+        summary.append(entry)
+
+    return summary
+
+
+
+# 6f) Viele Spiele auf einmal simulieren (Batch)
+
+def simulate_matches_batch(
+    team1_name: str,
+    team2_name: str,
+    player_specs,
+    n_sims: int,
+    threshold_block: float = 0.5,
+    seed=None,
+    dtype_policy: str = "default",
+    chunk_size: int = 100000,
+):
+    """
+    Simuliert n_sims Spiele vektorisiert und gibt nur die Ergebnisse
+    pro Spiel zurück (keine Details).
+    Die Spiele werden in Chunks von chunk_size gerechnet, damit die
+    Zwischenarrays (n_sims x Versuche) im Cache bzw. RAM bleiben.
+
+    dtype_policy: siehe DTYPE_POLICIES. Mit "compact" werden float32-
+    Zufallszahlen und int16-Punkte/Blocks benutzt (ca. halber bis viertel
+    Speicherbedarf, statistisch gleichwertig).
+
+    Returns:
+      dict mit Arrays der Länge n_sims:
+        "{team} points", "{team} shots blocked" für beide Teams
+      sowie Siegquoten (wins/draws) über alle Spiele.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1 (got {chunk_size})")
+
+    policy = _get_dtype_policy(dtype_policy)
+    team1, team2 = build_teams_from_players(team1_name, team2_name, player_specs)
+
+    slots = [
+        _expand_to_attempts(team_prob_arrays(team, threshold_block), policy)
+        for team in (team1, team2)
+    ]
+
+    points = [np.empty(n_sims, dtype=policy["count"]) for _ in slots]
+    blocks = [np.empty(n_sims, dtype=policy["count"]) for _ in slots]
+
+    rng = np.random.default_rng(seed)
+
+    for start in range(0, n_sims, chunk_size):
+        stop = min(start + chunk_size, n_sims)
+        m = stop - start
+
+        for i, s in enumerate(slots):
+            width = len(s["p_block"])
+            u_block = rng.random((m, width), dtype=policy["uniform"])
+            u_hit = rng.random((m, width), dtype=policy["uniform"])
+            blocked, hits = _simulate_attempts(s, u_block, u_hit)
+
+            points[i][start:stop] = hits @ s["points_per_hit"]
+            blocks[i][start:stop] = blocked.sum(axis=1, dtype=policy["count"])
+
+    wins1 = int(np.count_nonzero(points[0] > points[1]))
+    wins2 = int(np.count_nonzero(points[1] > points[0]))
+
+    return {
+        "team1_name": team1_name,
+        "team2_name": team2_name,
+        "n_sims": n_sims,
+        f"{team1_name} points": points[0],
+        f"{team2_name} points": points[1],
+        f"{team1_name} shots blocked": blocks[0],
+        f"{team2_name} shots blocked": blocks[1],
+        f"{team1_name} win rate": wins1 / n_sims if n_sims else 0.0,
+        f"{team2_name} win rate": wins2 / n_sims if n_sims else 0.0,
+        "draw rate": (n_sims - wins1 - wins2) / n_sims if n_sims else 0.0,
+    }
+
+
+
+# 6g) Seltene Ereignisse (Importance Sampling)
+
+def _tilted_outcomes(arrays: dict, theta: float, eta: float):
+    """
+    Exponentiell gekippte Verteilung eines einzelnen Versuchs pro Spieler+Wurfart.
+    Die vier Ausgänge (Block ja/nein x Treffer ja/nein) werden mit
+    exp(theta * Punkte + eta * Block) gewichtet und neu normiert.
+    Returns:
+      probs (4 x Anzahl Spieler+Wurfart, Reihenfolge 00, 01, 10, 11 = Block, Treffer),
+      log_z (log der Normierung pro Versuch)
+    """
+    pb, pnb, pbh = arrays["p_block"], arrays["p_nb"], arrays["p_b"]
+    pts = arrays["points_per_hit"]
+
+    q = np.stack([
+        (1 - pb) * (1 - pnb),
+        (1 - pb) * pnb,
+        pb * (1 - pbh),
+        pb * pbh,
+    ])
+    score = np.stack([np.zeros_like(pts), pts, np.zeros_like(pts), pts])
+    blk = np.array([0.0, 0.0, 1.0, 1.0])[:, None]
+
+    with np.errstate(divide="ignore"):
+        log_w = np.log(q) + theta * score + eta * blk
+
+    shift = log_w.max(axis=0)
+    w = np.exp(log_w - shift)
+    z = w.sum(axis=0)
+
+    return w / z, shift + np.log(z)
+
+
+def _tilt_moments(arrays: dict, probs):
+    """Erwartungswert und Kovarianz von (Punkte, Blocks) eines Teams unter probs."""
+    n, pts = arrays["attempts"], arrays["points_per_hit"]
+    p_hit = probs[1] + probs[3]
+    p_blk = probs[2] + probs[3]
+
+    mean = np.array([np.sum(n * pts * p_hit), np.sum(n * p_blk)])
+    cov_sb = np.sum(n * pts * (probs[3] - p_hit * p_blk))
+    cov = np.array([
+        [np.sum(n * pts**2 * p_hit * (1 - p_hit)), cov_sb],
+        [cov_sb, np.sum(n * p_blk * (1 - p_blk))],
+    ])
+    return mean, cov
+
+
+def _tilt_log_k(arrays: dict, opp_arrays, theta: float, eta: float) -> float:
+    """
+    Kumulantenfunktion K(theta, eta) der gekippten Statistik.
+    Mit opp_arrays wird der Gegner mit -theta gekippt (Statistik = Punktedifferenz).
+    """
+    _, log_z = _tilted_outcomes(arrays, theta, eta)
+    log_k = np.sum(arrays["attempts"] * log_z)
+    if opp_arrays is not None:
+        _, log_z_opp = _tilted_outcomes(opp_arrays, -theta, 0.0)
+        log_k += np.sum(opp_arrays["attempts"] * log_z_opp)
+    return float(log_k)
+
+
+def _solve_tilt(arrays: dict, opp_arrays, targets, max_param: float = 10.0):
+    """
+    Sucht (theta, eta) >= 0, so dass die gekippten Erwartungswerte von
+    (Punkte bzw. Punktedifferenz, Blocks) die Ziele treffen (None = nicht kippen).
+    Gedämpftes Newton-Verfahren auf K(theta, eta) - theta * a - eta * b.
+    Das Ergebnis muss nicht exakt sein: der Schätzer bleibt für jedes
+    (theta, eta) erwartungstreu, nur die Varianz hängt davon ab.
+    """
+    def moments(params):
+        probs, _ = _tilted_outcomes(arrays, *params)
+        mean, cov = _tilt_moments(arrays, probs)
+        if opp_arrays is not None:
+            probs_opp, _ = _tilted_outcomes(opp_arrays, -params[0], 0.0)
+            mean_opp, cov_opp = _tilt_moments(opp_arrays, probs_opp)
+            mean[0] -= mean_opp[0]
+            cov[0, 0] += cov_opp[0, 0]
+        return mean, cov
+
+    mean0, _ = moments(np.zeros(2))
+
+    active = np.array([t is not None and t > m for t, m in zip(targets, mean0)])
+    if not active.any():
+        return 0.0, 0.0
+    target = np.array([t if t is not None else 0.0 for t in targets], dtype=float)
+
+    def objective(params):
+        return _tilt_log_k(arrays, opp_arrays, *params) - params @ np.where(active, target, 0.0)
+
+    params = np.zeros(2)
+    value = objective(params)
+
+    for _ in range(100):
+        mean, cov = moments(params)
+
+        grad = np.where(active, mean - target, 0.0)
+        if np.max(np.abs(grad)) < 1e-6:
+            break
+
+        idx = np.flatnonzero(active)
+        hess = cov[np.ix_(idx, idx)] + 1e-9 * np.eye(len(idx))
+        step = np.zeros(2)
+        step[idx] = np.linalg.solve(hess, grad[idx])
+
+        # Schrittweite halbieren, bis das Ziel kleiner wird
+        for _ in range(30):
+            candidate = np.clip(params - step, 0.0, max_param)
+            candidate_value = objective(candidate)
+            if candidate_value <= value:
+                break
+            step /= 2
+        else:
+            break
+
+        if np.allclose(candidate, params):
+            break
+        params, value = candidate, candidate_value
+
+    return float(params[0]), float(params[1])
+
+
+def _tilted_slots(arrays: dict, theta: float, eta: float):
+    """Gekipptes Modell als normale Wahrscheinlichkeiten pro Versuch (für _simulate_attempts)."""
+    probs, _ = _tilted_outcomes(arrays, theta, eta)
+    p_blk = probs[2] + probs[3]
+    p_nb_den = probs[0] + probs[1]
+
+    tilted = dict(arrays)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tilted["p_block"] = p_blk
+        tilted["p_b"] = np.where(p_blk > 0, probs[3] / p_blk, arrays["p_b"])
+        tilted["p_nb"] = np.where(p_nb_den > 0, probs[1] / p_nb_den, arrays["p_nb"])
+
+    return _expand_to_attempts(tilted)
+
+
+def estimate_tail_probability(
+    team1_name: str,
+    team2_name: str,
+    player_specs,
+    team_name: str,
+    points_over=None,
+    blocks_at_least=None,
+    must_win: bool = False,
+    n_sims: int = 10000,
+    threshold_block: float = 0.5,
+    seed=None,
+    chunk_size: int = 100000,
+):
+    """
+    Schätzt die Wahrscheinlichkeit eines seltenen Ereignisses für team_name,
+    z.B. "Blitz erzielt mehr als 150 Punkte" (points_over=150) oder
+    "Wind gewinnt trotz mindestens 40 Blocks" (blocks_at_least=40, must_win=True).
+    Alle angegebenen Bedingungen müssen gleichzeitig erfüllt sein.
+
+    Importance Sampling: Block- und Treffer-Wahrscheinlichkeiten des Teams
+    werden exponentiell in Richtung des Ereignisses gekippt (theta für
+    Punkte, eta für Blocks), unter dem gekippten Modell simuliert und jedes
+    Spiel mit dem Likelihood-Quotienten
+      L = exp(-theta * Punkte - eta * Blocks + K(theta, eta))
+    zurückgewichtet. Bei must_win ohne points_over wird stattdessen die
+    Punktedifferenz gekippt (Gegner mit -theta), sonst bleibt der Gegner ungekippt.
+
+    Returns:
+      dict mit estimate, std_error, relative_error, theta, eta und
+      effective_sample_size (Kish) der Gewichte des Ereignisses.
+    """
+    if points_over is None and blocks_at_least is None and not must_win:
+        raise ValueError("At least one of points_over, blocks_at_least or must_win is required")
+    if n_sims < 2:
+        raise ValueError(f"n_sims must be at least 2 (got {n_sims})")
+
+    team1, team2 = build_teams_from_players(team1_name, team2_name, player_specs)
+    if team_name == team1_name:
+        team, opponent = team1, team2
+    elif team_name == team2_name:
+        team, opponent = team2, team1
+    else:
+        raise ValueError(
+            f"Invalid team name '{team_name}'. "
+            f"Allowed: '{team1_name}' or '{team2_name}'"
+        )
+
+    arrays = team_prob_arrays(team, threshold_block)
+    opp_arrays = team_prob_arrays(opponent, threshold_block)
+
+    # Ziele für das Kippen: knapp über der Schwelle
+    margin_tilt = must_win and points_over is None
+    if points_over is not None:
+        target_points = points_over + 1
+    elif margin_tilt:
+        target_points = 1
+    else:
+        target_points = None
+
+    tilt_opp = opp_arrays if margin_tilt else None
+    theta, eta = _solve_tilt(arrays, tilt_opp, (target_points, blocks_at_least))
+    log_k = _tilt_log_k(arrays, tilt_opp, theta, eta)
+
+    slots = _tilted_slots(arrays, theta, eta)
+    opp_slots = _tilted_slots(opp_arrays, -theta if margin_tilt else 0.0, 0.0)
+
+    rng = np.random.default_rng(seed)
+    values = np.empty(n_sims)
+
+    for start in range(0, n_sims, chunk_size):
+        stop = min(start + chunk_size, n_sims)
+        m = stop - start
+
+        width = len(slots["p_block"])
+        blocked, hits = _simulate_attempts(slots, rng.random((m, width)), rng.random((m, width)))
+        score = hits @ slots["points_per_hit"]
+        n_blocked = blocked.sum(axis=1)
+
+        width = len(opp_slots["p_block"])
+        _, opp_hits = _simulate_attempts(opp_slots, rng.random((m, width)), rng.random((m, width)))
+        opp_score = opp_hits @ opp_slots["points_per_hit"]
+
+        event = np.ones(m, dtype=bool)
+        if points_over is not None:
+            event &= score > points_over
+        if blocks_at_least is not None:
+            event &= n_blocked >= blocks_at_least
+        if must_win:
+            event &= score > opp_score
+
+        tilted_stat = score - opp_score if margin_tilt else score
+        log_lr = -theta * tilted_stat - eta * n_blocked + log_k
+        values[start:stop] = np.where(event, np.exp(log_lr), 0.0)
+
+    estimate, std_error = _mean_and_se(values)
+    sum_sq = float(np.sum(values**2))
+
+    return {
+        "team": team_name,
+        "estimate": estimate,
+        "std_error": std_error,
+        "relative_error": std_error / estimate if estimate > 0 else float("inf"),
+        "n_sims": n_sims,
+        "theta": theta,
+        "eta": eta,
+        "effective_sample_size": float(np.sum(values) ** 2 / sum_sq) if sum_sq > 0 else 0.0,
+    }
+
+
+
 # 7) Balkendiagramme für eine Simulation (Monte-Carlo)
 
 def plot_match_barcharts(result: dict):
@@ -392,6 +1154,9 @@ def plot_match_barcharts(result: dict):
       - Punkte pro Spieler und Wurfart (gestapelte Balken)
       - Gesamtpunkte pro Team
     """
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
     details = result.get("details", [])
     if not details:
         print("Keine Details zum Plotten vorhanden (result['details'] fehlt).")
@@ -438,6 +1203,9 @@ def plot_expected_details_barcharts(expected_result: dict):
       - erwartete Punkte pro Spieler und Wurfart (gestapelte Balken)
       - erwartete Gesamtpunkte pro Team
     """
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
     details = expected_result.get("details", [])
     if not details:
         print("Keine erwarteten Details zum Plotten vorhanden.")
@@ -473,3 +1241,38 @@ def plot_expected_details_barcharts(expected_result: dict):
     plt.xticks(rotation=0)
     plt.tight_layout()
     plt.show()
+
+
+
+# 10) Kurzer Test: Importance Sampling gegen einfache Simulation
+if __name__ == "__main__":
+    specs = [
+        ("Alexis", "Wind", 50, 25, 9, 16, 2),
+        ("Jakov", "Wind", 50, 30, 10, 10, 3),
+        ("Loukas", "Blitz", 100, 20, 10, 70, 0),
+    ]
+    batch = simulate_matches_batch("Wind", "Blitz", specs, 200000, seed=1)
+    blitz_points = batch["Blitz points"]
+
+    # Nicht seltene Ereignisse: beide Schätzer müssen übereinstimmen
+    for points_over in (70, 75):
+        p_bf = float((blitz_points > points_over).mean())
+        se_bf = (p_bf * (1 - p_bf) / len(blitz_points)) ** 0.5
+
+        res = estimate_tail_probability(
+            "Wind", "Blitz", specs, "Blitz", points_over=points_over, n_sims=20000, seed=2
+        )
+        tol = 4 * (res["std_error"] ** 2 + se_bf ** 2) ** 0.5
+        print(
+            f"P(Blitz > {points_over}): IS={res['estimate']:.4f} ± {res['std_error']:.4f}, "
+            f"einfach={p_bf:.4f} ± {se_bf:.4f}"
+        )
+        assert abs(res["estimate"] - p_bf) <= tol, (res["estimate"], p_bf, tol)
+
+    # Gekippte Punktedifferenz (must_win) gegen die einfache Siegquote
+    p_bf = batch["Wind win rate"]
+    se_bf = (p_bf * (1 - p_bf) / batch["n_sims"]) ** 0.5
+    res = estimate_tail_probability("Wind", "Blitz", specs, "Wind", must_win=True, n_sims=20000, seed=2)
+    tol = 4 * (res["std_error"] ** 2 + se_bf ** 2) ** 0.5
+    print(f"P(Wind gewinnt): IS={res['estimate']:.4f} ± {res['std_error']:.4f}, einfach={p_bf:.4f} ± {se_bf:.4f}")
+    assert abs(res["estimate"] - p_bf) <= tol, (res["estimate"], p_bf, tol)
@@ -0,0 +1,291 @@
+import hashlib
+import json
+import numbers
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import closing
+
+import numpy as np
+
+import pässengegenblock
+import spielerstats
+import simulation
+
+# --- Persistenter Cache für Erwartungswerte und Simulationen (SQLite) ---
+DEFAULT_CACHE_PATH = ".simulation_cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Erhöhen, wenn sich die Berechnung ändert -> alte Einträge werden nicht mehr gefunden
+CACHE_VERSION = 3
+
+
+# 1) Schlüssel: Daten-Fingerprint + Eingaben
+
+def data_fingerprint() -> str:
+    """
+    SHA-256 über die Daten-Fingerprints von spielerstats und pässengegenblock.
+    Sind die Daten geladen, ist das der Fingerprint der geladenen Daten,
+    sonst der der CSV-Bytes (ohne Parsen -> ein Cache-Treffer braucht kein pandas).
+    Hat sich die CSV geändert, laden beide Module neu und der Fingerprint
+    ändert sich mit – alte Cache-Einträge werden nicht mehr gefunden.
+    """
+    digest = hashlib.sha256()
+    digest.update(spielerstats.data_fingerprint().encode("ascii"))
+    digest.update(pässengegenblock.data_fingerprint().encode("ascii"))
+    return digest.hexdigest()
+
+
+def _specs_param(player_specs):
+    """
+    player_specs genau so, wie sie übergeben wurden (ohne Trimmen oder
+    Umwandeln; nur numpy-Skalare werden in cache_key zu Python-Zahlen).
+    Ungültige Angaben bekommen so nie den Schlüssel gültiger Angaben und
+    lösen bei der Berechnung weiterhin ihren Fehler aus.
+    Die Reihenfolge bleibt erhalten, weil sie die Reihenfolge der Details bestimmt.
+    """
+    return [list(spec) for spec in player_specs]
+
+
+def _json_default(obj):
+    # numpy-Skalare wie die gleichwertigen Python-Zahlen behandeln (np.int64(3) == 3)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return repr(obj)
+
+
+def cache_key(kind: str, params: dict, fingerprint: str) -> str:
+    """
+    Kanonischer Hash aus Art der Berechnung, Parametern, Daten-Fingerprint
+    und der Glättung der Trefferwahrscheinlichkeiten (spielerstats.PRIOR_STRENGTH).
+    """
+    payload = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "kind": kind,
+            "params": params,
+            "data": fingerprint,
+            "prior_strength": spielerstats.PRIOR_STRENGTH,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=_json_default,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+
+# 2) SQLite-Speicher mit LRU-Verdrängung
+
+def _connect(cache_path: str):
+    conn = sqlite3.connect(cache_path, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS entries ("
+        " key TEXT PRIMARY KEY,"
+        " fingerprint TEXT NOT NULL,"
+        " value BLOB NOT NULL,"
+        " size INTEGER NOT NULL,"
+        " last_access REAL NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+    return conn
+
+
+def _evict(conn, max_bytes: int, fingerprint: str):
+    """
+    Löscht Einträge, bis die Größe passt: zuerst die zu anderen Daten
+    (anderer Fingerprint), danach die am längsten nicht benutzten.
+    """
+    (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+    if total <= max_bytes:
+        return
+
+    rows = conn.execute(
+        "SELECT key, size FROM entries ORDER BY fingerprint = ? ASC, last_access ASC",
+        (fingerprint,),
+    ).fetchall()
+    for key, size in rows:
+        if total <= max_bytes:
+            break
+        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        total -= size
+
+
+def cached_call(
+    kind: str,
+    params: dict,
+    compute,
+    cache_path: str = DEFAULT_CACHE_PATH,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+):
+    """
+    Liefert das Ergebnis von compute() aus dem Cache oder berechnet und speichert es.
+    kind + params (JSON-serialisierbar) + Daten-Fingerprint bilden den Schlüssel.
+    """
+    fingerprint = data_fingerprint()
+    key = cache_key(kind, params, fingerprint)
+
+    with closing(_connect(cache_path)) as conn:
+        row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            _evict(conn, max_bytes, fingerprint)
+            conn.commit()
+            return pickle.loads(row[0])
+
+        result = compute()
+
+        # Daten während der Berechnung geändert -> Ergebnis passt nicht zum Schlüssel
+        if data_fingerprint() != fingerprint:
+            return result
+
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # Zu große Ergebnisse nicht speichern; die Größengrenze gilt trotzdem
+        if len(blob) <= max_bytes:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, fingerprint, value, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, fingerprint, sqlite3.Binary(blob), len(blob), time.time()),
+            )
+        _evict(conn, max_bytes, fingerprint)
+        conn.commit()
+
+        return result
+
+
+def clear_cache(cache_path: str = DEFAULT_CACHE_PATH):
+    """Löscht alle Einträge im Cache."""
+    if not os.path.exists(cache_path):
+        return
+    with closing(sqlite3.connect(cache_path, timeout=30)) as conn:
+        conn.execute("DROP TABLE IF EXISTS entries")
+        conn.commit()
+
+
+
+# 3) Gecachte Varianten der Funktionen aus simulation.py
+
+def cached_expected_match_from_player_specs(
+    team1_name: str,
+    team2_name: str,
+    player_specs,
+    threshold_block: float = 0.5,
+    cache_path: str = DEFAULT_CACHE_PATH,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+):
+    """Wie simulation.expected_match_from_player_specs, aber mit persistentem Cache."""
+    params = {
+        "team1_name": team1_name,
+        "team2_name": team2_name,
+        "player_specs": _specs_param(player_specs),
+        "threshold_block": threshold_block,
+    }
+    return cached_call(
+        "expected_match",
+        params,
+        lambda: simulation.expected_match_from_player_specs(
+            team1_name, team2_name, player_specs, threshold_block
+        ),
+        cache_path,
+        max_bytes,
+    )
+
+
+def cached_expected_details_from_player_specs(
+    team1_name: str,
+    team2_name: str,
+    player_specs,
+    threshold_block: float = 0.5,
+    cache_path: str = DEFAULT_CACHE_PATH,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+):
+    """Wie simulation.expected_details_from_player_specs, aber mit persistentem Cache."""
+    params = {
+        "team1_name": team1_name,
+        "team2_name": team2_name,
+        "player_specs": _specs_param(player_specs),
+        "threshold_block": threshold_block,
+    }
+    return cached_call(
+        "expected_details",
+        params,
+        lambda: simulation.expected_details_from_player_specs(
+            team1_name, team2_name, player_specs, threshold_block
+        ),
+        cache_path,
+        max_bytes,
+    )
+
+
+def cached_simulate_matches_batch(
+    team1_name: str,
+    team2_name: str,
+    player_specs,
+    n_sims: int,
+    threshold_block: float = 0.5,
+    seed=None,
+    dtype_policy: str = "default",
+    cache_path: str = DEFAULT_CACHE_PATH,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+):
+    """
+    Wie simulation.simulate_matches_batch, aber mit persistentem Cache.
+    Nur mit festem ganzzahligem seed reproduzierbar -> ohne seed oder mit
+    SeedSequence/Generator wird ohne Cache gerechnet.
+    """
+    def compute():
+        return simulation.simulate_matches_batch(
+            team1_name,
+            team2_name,
+            player_specs,
+            n_sims,
+            threshold_block=threshold_block,
+            seed=seed,
+            dtype_policy=dtype_policy,
+        )
+
+    if seed is None or isinstance(seed, bool) or not isinstance(seed, numbers.Integral):
+        return compute()
+
+    params = {
+        "team1_name": team1_name,
+        "team2_name": team2_name,
+        "player_specs": _specs_param(player_specs),
+        "threshold_block": threshold_block,
+        "n_sims": n_sims,
+        "seed": seed,
+        "dtype_policy": dtype_policy,
+    }
+    return cached_call("simulate_matches_batch", params, compute, cache_path, max_bytes)
+
+
+
+# Kurzer Test: ein Cache-Treffer in einem neuen Prozess lädt kein pandas
+if __name__ == "__main__":
+    import subprocess
+    import sys
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite")
+        code = (
+            "import sys, time, simulation_cache as sc\n"
+            "specs = [('Alexis', 'Wind', 50, 25, 9, 16, 2), ('Loukas', 'Blitz', 100, 20, 10, 70, 0)]\n"
+            "start = time.perf_counter()\n"
+            f"sc.cached_expected_match_from_player_specs('Wind', 'Blitz', specs, cache_path={path!r})\n"
+            "print(f'{time.perf_counter() - start:.3f}s', 'pandas' in sys.modules)\n"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [
+            os.path.dirname(os.path.abspath(__file__)), os.environ.get("PYTHONPATH"),
+        ])))
+        runs = [
+            subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+            .stdout.split()
+            for _ in range(2)
+        ]
+
+    print(f"Berechnung: {runs[0][0]}, Cache-Treffer: {runs[1][0]}")
+    assert runs[0][1] == "True", "erste Berechnung sollte pandas laden"
+    assert runs[1][1] == "False", "Cache-Treffer darf pandas nicht importieren"
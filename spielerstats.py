@@ -1,31 +1,110 @@
-import pandas as pd
+import hashlib
+import io
+import os
+from typing import TYPE_CHECKING
 
-# --- Load & clean data ---
+if TYPE_CHECKING:
+    import pandas as pd
+
+# --- Load & clean data (lazy: erst beim ersten Zugriff) ---
 CSV_PATH = "Basketball_Daten.csv"
 
-df = pd.read_csv(CSV_PATH, sep=";", encoding="utf-8-sig")
+# Stärke der Glättung in hit_prob_table (Anzahl Pseudo-Würfe pro Stufe)
+PRIOR_STRENGTH = 4.0
+
+_df = None
+_df_stamp = None
+_df_fingerprint = None
+_hit_prob_tables = {}
+
+
+def _file_stamp(path: str):
+    """(Änderungszeit, Größe) einer Datei – ändert sich, sobald die Datei neu geschrieben wird."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def reload_data():
+    """
+    Verwirft die geladenen Daten und die daraus berechneten Tabellen.
+    Der nächste Zugriff liest die CSV neu. Wird automatisch aufgerufen,
+    wenn sich die CSV-Datei geändert hat.
+    """
+    global _df, _df_stamp, _df_fingerprint
+    _df = None
+    _df_stamp = None
+    _df_fingerprint = None
+    _hit_prob_tables.clear()
+
 
-# Normalize columns and string values
-df.columns = df.columns.str.strip().str.lower()   # fixes "shot_type " -> "shot_type"
-df = df.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
+def load_df() -> "pd.DataFrame":
+    """
+    Lädt und bereinigt die Wurfdaten beim ersten Aufruf,
+    danach wird der bereits geladene DataFrame zurückgegeben.
+    Hat sich die CSV-Datei seitdem geändert, wird neu geladen.
+    """
+    global _df, _df_stamp, _df_fingerprint
+    stamp = _file_stamp(CSV_PATH)
+    if _df is not None:
+        if stamp == _df_stamp:
+            return _df
+        reload_data()
+
+    import pandas as pd
+
+    # Einmal lesen: dieselben Bytes für DataFrame und Fingerprint
+    with open(CSV_PATH, "rb") as f:
+        raw = f.read()
+
+    df = pd.read_csv(io.BytesIO(raw), sep=";", encoding="utf-8-sig")
 
-# Map German labels to numeric for hits/blocks
-if df["hit"].dtype == object:
-    df["hit"] = df["hit"].map({"Ja": 1, "Nein": 0}).astype("Int64")
-if df["block"].dtype == object:
-    df["block"] = df["block"].map({"Ja": 1, "Nein": 0}).astype("Int64")
+    # Normalize columns and string values
+    df.columns = df.columns.str.strip().str.lower()   # fixes "shot_type " -> "shot_type"
+    df = df.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
 
-# Make shot_type consistent
-df["shot_type"] = df["shot_type"].str.lower()  # values: "wurf", "layup", "3er-wurf"
+    # Map German labels to numeric for hits/blocks
+    if df["hit"].dtype == object:
+        df["hit"] = df["hit"].map({"Ja": 1, "Nein": 0}).astype("Int64")
+    if df["block"].dtype == object:
+        df["block"] = df["block"].map({"Ja": 1, "Nein": 0}).astype("Int64")
 
-def _rate_for_type(player_df: pd.DataFrame, shot_type_value: str) -> float:
+    # Make shot_type consistent
+    df["shot_type"] = df["shot_type"].str.lower()  # values: "wurf", "layup", "3er-wurf"
+
+    _df = df
+    _df_stamp = stamp
+    _df_fingerprint = hashlib.sha256(raw).hexdigest()
+    return _df
+
+
+def data_fingerprint() -> str:
+    """
+    SHA-256 der CSV-Bytes, ohne die Daten zu parsen (kein pandas-Import).
+    Sind die Daten geladen und die Datei unverändert, ist das der
+    Fingerprint der geladenen Daten; sonst der der Datei, die load_df()
+    beim nächsten Aufruf lesen wird.
+    """
+    if _df is not None and _file_stamp(CSV_PATH) == _df_stamp:
+        return _df_fingerprint
+    with open(CSV_PATH, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def __getattr__(name):
+    # spielerstats.df bleibt verfügbar, lädt die Daten aber erst beim Zugriff
+    if name == "df":
+        return load_df()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _rate_for_type(player_df: "pd.DataFrame", shot_type_value: str) -> float:
     """Overall hit rate for a given shot type within the player's rows."""
     subset = player_df[player_df["shot_type"] == shot_type_value]
     if len(subset) == 0:
         return 0.0
     return float(round(subset["hit"].mean(), 3))
 
-def _rate_for_type_and_block(player_df: pd.DataFrame, shot_type_value: str, block_value: int) -> float:
+def _rate_for_type_and_block(player_df: "pd.DataFrame", shot_type_value: str, block_value: int) -> float:
     """Hit rate for a given shot type under a specific block condition."""
     subset = player_df[
         (player_df["shot_type"] == shot_type_value) &
@@ -43,6 +122,7 @@ def get_player_stats(player: str) -> str:
       - Erfolg-Rate je Wurfart with labeled p_w, p_lp, p_3w (overall)
       - Split 'ohne Block' (Block=0) and 'mit Block' (Block=1) for each Wurfart
     """
+    df = load_df()
     p = player.strip().lower()
     player_df = df[df["player_name"].str.lower() == p]
 
@@ -71,6 +151,63 @@ def get_player_stats(player: str) -> str:
 
     return "\n".join(lines)
 
+def hit_prob_table(prior_strength: float = PRIOR_STRENGTH) -> dict:
+    """
+    Geglättete Trefferwahrscheinlichkeiten für jede Kombination
+    (Spieler, Wurfart), berechnet in einem vektorisierten Durchlauf
+    und danach aus dem Speicher geliefert.
+
+    Beta-Binomial-Shrinkage in drei Stufen, getrennt für ohne/mit Block:
+      Team:    mu_team = (Treffer + 0.5) / (Würfe + 1)              (Jeffreys-Prior)
+      Wurfart: mu_st   = (Treffer + m * mu_team) / (Würfe + m)
+      Zelle:   p       = (Treffer + m * mu_st) / (Würfe + m)
+    mit m = prior_strength. Zellen mit wenigen oder keinen Würfen werden
+    so zum Mittel der Wurfart gezogen statt auf 0.0 gesetzt.
+
+    Returns:
+      dict {(player_name.lower(), shot_type): (p_nb, p_b)}
+    """
+    if prior_strength <= 0:
+        raise ValueError(f"prior_strength must be positive (got {prior_strength})")
+    # load_df() zuerst: verwirft die Tabellen, falls sich die Daten geändert haben
+    df = load_df()
+    if prior_strength in _hit_prob_tables:
+        return _hit_prob_tables[prior_strength]
+
+    import pandas as pd
+
+    df = df.dropna(subset=["hit", "block"])
+    players = df["player_name"].str.lower()
+
+    # Treffer und Würfe pro (Spieler, Wurfart, Block) inkl. leerer Zellen
+    grid = pd.MultiIndex.from_product(
+        [sorted(players.unique()), sorted(df["shot_type"].unique()), [0, 1]],
+        names=["player", "shot_type", "block"],
+    )
+    counts = (
+        df.assign(player=players, hit=df["hit"].astype(int), block=df["block"].astype(int))
+          .groupby(["player", "shot_type", "block"])["hit"]
+          .agg(["sum", "count"])
+          .reindex(grid, fill_value=0)
+    )
+
+    m = float(prior_strength)
+    team = counts.groupby(level="block").sum()
+    mu_team = (team["sum"] + 0.5) / (team["count"] + 1.0)
+
+    shot = counts.groupby(level=["shot_type", "block"]).sum()
+    mu_shot = (shot["sum"] + m * mu_team.reindex(shot.index.get_level_values("block")).to_numpy()) / (shot["count"] + m)
+
+    prior = mu_shot.reindex(counts.index.droplevel("player")).to_numpy()
+    p = ((counts["sum"] + m * prior) / (counts["count"] + m)).unstack("block")
+
+    table = {
+        key: (float(p_nb), float(p_b))
+        for key, p_nb, p_b in zip(p.index, p[0], p[1])
+    }
+    _hit_prob_tables[prior_strength] = table
+    return table
+
 """
 Example Usage 
 print(get_player_stats("Alexis"))